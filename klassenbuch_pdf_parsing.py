@@ -32,11 +32,24 @@ Requirements:
 import re
 import sys
 import os
+import io
+import csv
 import glob
+import json
+import hashlib
 import argparse
 import tomllib
 import textwrap
+import multiprocessing
+from collections import ChainMap
+from collections.abc import Iterator
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import partial
+from itertools import pairwise
 from pathlib import Path
 
 import pdfplumber
@@ -57,11 +70,34 @@ SCHEMA_TABLES = [
     "lernfeld", "dozent", "lernfeld_dozent", "lerntag", "unterrichtseinheit",
 ]
 
+# UNIQUE (vorname, nachname) on dozent — same name PostgreSQL gives the
+# table constraint in init_db.sql.  Only created when no unique index on
+# exactly those two columns exists, whatever its name (DOZENT_UNIQUE_SQL).
+DOZENT_UNIQUE_INDEX = "dozent_vorname_nachname_key"
+DOZENT_UNIQUE_SQL = """
+    SELECT EXISTS (
+        SELECT 1
+        FROM   pg_index i
+        WHERE  i.indrelid = 'dozent'::regclass
+          AND  i.indisunique AND i.indimmediate
+          AND  i.indpred IS NULL AND i.indexprs IS NULL
+          AND  i.indnkeyatts = 2
+          AND  ARRAY(SELECT a.attname::text
+                     FROM   pg_attribute a
+                     WHERE  a.attrelid = i.indrelid
+                       AND  a.attnum IN (i.indkey[0], i.indkey[1])
+                     ORDER  BY a.attname) = ARRAY['nachname', 'vorname']
+    );
+"""
+
 # Column x-ranges in the Themendokumentation template (points)
 COL_STUNDE      = (30,  74)
 COL_LEHRINHALTE = (74,  359)
 COL_DOZENT      = (459, 549)
 
+# Valid stunde numbers as they appear in the Stunde column
+STUNDE_STRS = frozenset("123456789")
+
 # Words that bleed in from the table header row — must be filtered out
 HEADER_NOISE = frozenset({
     "Stunde", "Lehrinhalte", "Lernformat/-methodik",
@@ -77,35 +113,69 @@ HEADER_NOISE = frozenset({
 def parse_date(raw: str) -> str:
     return datetime.strptime(raw.strip(), "%d.%m.%Y").strftime("%Y-%m-%d")
 
-def sql_escape(text: str) -> str:
-    return text.replace("'", "''")
+def sql_literal(value: str | int | None) -> str:
+    """
+    Render a value as an SQL literal for the standalone SQL file.
+    Strings use standard-conforming quoting — only ' is doubled, backslashes
+    stay literal (the file sets standard_conforming_strings = on).  NUL bytes,
+    which PostgreSQL text cannot hold, are dropped.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, int):
+        return str(value)
+    return "'" + value.replace("\x00", "").replace("'", "''") + "'"
+
+def db_text(value: str) -> str:
+    """
+    Make extracted text storable as PostgreSQL text: NUL bytes are dropped
+    (as in sql_literal) and anything UTF-8 cannot encode, such as a lone
+    surrogate from a broken PDF font map, becomes '?'.
+    """
+    return value.replace("\x00", "").encode("utf-8", "replace").decode("utf-8")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Header parsing  (regex on raw page text)
 # ─────────────────────────────────────────────────────────────────────────────
 
-DATUM_RE = re.compile(r"Datum:\s*(\d{2}\.\d{2}\.\d{4})")
-TITEL_RE = re.compile(
-    r"Titel:\s*(LF[-\w]*)\s+(.+?)"
-    r"(?:\s+(\d{2}\.\d{2}\.\d{4})-(\d{2}\.\d{2}\.\d{4})?)?"
+# Datum and Titel are found in one pass over the page text
+HEADER_RE = re.compile(
+    r"Datum:\s*(?P<datum>\d{2}\.\d{2}\.\d{4})"
+    r"|Titel:\s*(?P<lf>LF[-\w]*)\s+(?P<titel>.+?)"
+    r"(?:\s+(?P<start>\d{2}\.\d{2}\.\d{4})-(?P<end>\d{2}\.\d{2}\.\d{4})?)?"
     r"\s*$",
     re.MULTILINE,
 )
+# Finds a Datum that sits on a Titel line (swallowed by the title match)
+DATUM_RE = re.compile(r"Datum:\s*(?P<datum>\d{2}\.\d{2}\.\d{4})")
+_DOZENT_NOISE_RE = re.compile(r"\bDozent\b")
+_PERM_TABLE_RE   = re.compile(r'table "?(\w+)"?')
 
 def parse_header(text: str) -> dict:
-    datum_m = DATUM_RE.search(text)
-    titel_m = TITEL_RE.search(text)
+    datum_m = titel_m = None
+    for m in HEADER_RE.finditer(text):
+        if m["datum"] is not None:
+            datum_m = datum_m or m
+        else:
+            titel_m = titel_m or m
+        if datum_m and titel_m:
+            break
+    # A Datum swallowed by a Titel match ahead of the first free Datum still
+    # counts as the first one
+    if titel_m and (not datum_m or titel_m.start() < datum_m.start()):
+        end = datum_m.start() if datum_m else len(text)
+        datum_m = DATUM_RE.search(text, titel_m.start(), end) or datum_m
     if not datum_m:
         raise ValueError("Datum not found in PDF header")
     if not titel_m:
         raise ValueError("Titel / Lernfeld not found in PDF header")
-    start_raw = titel_m.group(3)
-    end_raw   = titel_m.group(4)
+    start_raw = titel_m["start"]
+    end_raw   = titel_m["end"]
     return {
-        "datum":       parse_date(datum_m.group(1)),
-        "lernfeld_id": titel_m.group(1),
-        "titel":       titel_m.group(2).strip(),
+        "datum":       parse_date(datum_m["datum"]),
+        "lernfeld_id": titel_m["lf"],
+        "titel":       titel_m["titel"].strip(),
         "start_datum": parse_date(start_raw) if start_raw else None,
         "end_datum":   parse_date(end_raw)   if end_raw   else None,
     }
@@ -123,22 +193,28 @@ def parse_header(text: str) -> dict:
 # against rows where the stunde number is vertically offset from the content.
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _words_in_col(words: list, x0: float, x1: float,
-                  y0: float, y1: float) -> list[str]:
-    """Return texts of all words whose x0 is inside [x0,x1) and top is in [y0,y1)."""
-    return [
-        w["text"] for w in words
-        if x0 <= w["x0"] < x1 and y0 <= w["top"] < y1
-    ]
+def _index_by_top(words: list) -> tuple[list[int], list[float]]:
+    """
+    Build a y-index over `words`: word positions sorted by 'top', plus the
+    matching sorted tops for bisect.  Built once per page.
+    """
+    order = sorted(range(len(words)), key=lambda i: words[i]["top"])
+    return order, [words[i]["top"] for i in order]
 
 
-def _words_in_col_with_pos(words: list, x0: float, x1: float,
-                            y0: float, y1: float) -> list[dict]:
-    """Like _words_in_col but returns full word dicts (with 'top' for line detection)."""
-    return [
-        w for w in words
-        if x0 <= w["x0"] < x1 and y0 <= w["top"] < y1
-    ]
+def _words_in_band(words: list, index: tuple[list[int], list[float]],
+                   x0: float, x1: float, y0: float, y1: float,
+                   skip: frozenset[str] = frozenset()) -> list[dict]:
+    """
+    Return word dicts whose x0 is inside [x0,x1) and top is in [y0,y1),
+    leaving out words whose text is in `skip`.
+    The y-range is sliced via bisect on `index` (see _index_by_top); matches
+    keep their original reading order, which _join_inhalt relies on.
+    """
+    order, tops = index
+    band = order[bisect_left(tops, y0):bisect_left(tops, y1)]
+    return [w for w in (words[i] for i in sorted(band))
+            if x0 <= w["x0"] < x1 and w["text"] not in skip]
 
 
 def _join_inhalt(word_dicts: list[dict]) -> str:
@@ -189,7 +265,7 @@ def _first_dozent(raw_words: list[str]) -> tuple[str, str]:
     """
     text = " ".join(raw_words)
     # Strip header noise
-    text = re.sub(r"\bDozent\b", "", text).strip()
+    text = _DOZENT_NOISE_RE.sub("", text).strip()
     if not text:
         return ("", "")
     if "," in text:
@@ -232,25 +308,56 @@ def _detect_row_boundaries(words: list, table_top: float,
     return gaps if gaps else None
 
 
-def parse_rows_from_page(page) -> list[dict]:
+def _words_to_text(words: list, y_tolerance: float = 3) -> str:
+    """
+    Rebuild plain page text from extract_words output, like page.extract_text():
+    words whose top is within y_tolerance of a line's first word share that
+    line, ordered left to right.
+    """
+    lines: list[list[dict]] = []
+    for w in sorted(words, key=lambda w: w["top"]):
+        if lines and w["top"] - lines[-1][0]["top"] <= y_tolerance:
+            lines[-1].append(w)
+        else:
+            lines.append([w])
+    return "\n".join(
+        " ".join(w["text"] for w in sorted(line, key=lambda w: w["x0"]))
+        for line in lines
+    )
+
+
+@dataclass(slots=True)
+class Row:
+    """One lesson row of the Themendokumentation table."""
+    stunde:          int
+    inhalt:          str
+    dozent_vorname:  str
+    dozent_nachname: str
+
+
+def parse_rows_from_page(page, words: list | None = None) -> list[Row]:
     """
     Extract all lesson rows from a Themendokumentation page.
-    Returns list of {stunde, inhalt, dozent_vorname, dozent_nachname}.
+    Pass `words` when the page's words were already extracted.
 
     Row boundaries are determined by visible gaps between cell content in the
     Lehrinhalte column (reliable for dense multi-line cells).  Falls back to
     stunde-number midpoints when no gaps are found (sparse PDFs).
     """
-    words = page.extract_words(x_tolerance=3, y_tolerance=3)
-
-    # ── Locate stunde numbers 1-9 ──────────────────────────────────────────
-    raw_stunden = [
-        (int(w["text"]), w["top"])
-        for w in words
-        if w["text"].isdigit()
-        and 1 <= int(w["text"]) <= 9
-        and COL_STUNDE[0] <= w["x0"] < COL_STUNDE[1]
-    ]
+    if words is None:
+        words = page.extract_words(x_tolerance=3, y_tolerance=3)
+
+    # ── Locate stunde numbers 1-9 (and the lowest non-footer word) ─────────
+    raw_stunden: list[tuple[int, float]] = []
+    table_bottom = None
+    for w in words:
+        text = w["text"]
+        if text in STUNDE_STRS and COL_STUNDE[0] <= w["x0"] < COL_STUNDE[1]:
+            raw_stunden.append((int(text), w["top"]))
+        if w["bottom"] < 700 and (table_bottom is None or w["bottom"] > table_bottom):
+            table_bottom = w["bottom"]
+    if table_bottom is None:
+        table_bottom = 600
     if not raw_stunden:
         raise ValueError("No stunde numbers (1-9) found in Stunde column")
 
@@ -298,31 +405,28 @@ def parse_rows_from_page(page) -> list[dict]:
 
     # ── Fallback: midpoint between consecutive stunde numbers ─────────────
     if not gap_separators:
-        table_bottom = max(
-            (w["bottom"] for w in words if w["bottom"] < 700),
-            default=600,
-        )
-        boundaries = []
-        for i, (nr, top) in enumerate(stunden):
-            y_start = (stunden[i - 1][1] + top) / 2 if i > 0 else top - 30
-            y_end   = (top + stunden[i + 1][1]) / 2  if i + 1 < len(stunden)                       else table_bottom
-            boundaries.append((nr, y_start, y_end))
+        # Row i spans edges[i]..edges[i+1]; inner edges are the midpoints
+        tops  = [top for _, top in stunden]
+        edges = [tops[0] - 30, *((a + b) / 2 for a, b in pairwise(tops)), table_bottom]
+        boundaries = [(nr, y0, y1) for (nr, _), y0, y1 in zip(stunden, edges, edges[1:])]
 
     # ── Extract content for each row ──────────────────────────────────────
+    index = _index_by_top(words)
     rows = []
     for nr, y0, y1 in boundaries:
-        inhalt_dicts = _words_in_col_with_pos(words, COL_LEHRINHALTE[0], COL_LEHRINHALTE[1], y0, y1)
-        dozent_words = _words_in_col(words, COL_DOZENT[0],      COL_DOZENT[1],      y0, y1)
+        inhalt_dicts = _words_in_band(words, index, COL_LEHRINHALTE[0], COL_LEHRINHALTE[1],
+                                      y0, y1, skip=HEADER_NOISE)
+        dozent_words = [w["text"] for w in
+                        _words_in_band(words, index, COL_DOZENT[0], COL_DOZENT[1], y0, y1)]
 
-        inhalt_dicts = [w for w in inhalt_dicts if w["text"] not in HEADER_NOISE]
         nachname, vorname = _first_dozent(dozent_words)
 
-        rows.append({
-            "stunde":          nr,
-            "inhalt":          _join_inhalt(inhalt_dicts),
-            "dozent_vorname":  vorname,
-            "dozent_nachname": nachname,
-        })
+        rows.append(Row(
+            stunde=nr,
+            inhalt=_join_inhalt(inhalt_dicts),
+            dozent_vorname=vorname,
+            dozent_nachname=nachname,
+        ))
 
     return rows
 
@@ -333,29 +437,136 @@ def parse_rows_from_page(page) -> list[dict]:
 
 def extract_pdf(pdf_path: str) -> dict:
     with pdfplumber.open(pdf_path) as pdf:
-        # Header is always on page 1
-        text = pdf.pages[0].extract_text() or ""
-        header = parse_header(text)
-
         # Collect rows across ALL pages (some PDFs overflow to page 2+)
         # Track which stunde numbers have already been found so continuation
         # pages (which repeat header/footer but no new stunden) are skipped cleanly.
         seen_stunden = set()
         all_rows = []
-        for page in pdf.pages:
+        for page_no, page in enumerate(pdf.pages):
+            # One layout pass per page — header text and rows share the words
+            words = page.extract_words(x_tolerance=3, y_tolerance=3)
+            # The words are plain dicts; drop pdfplumber's per-page char /
+            # object caches now instead of holding every page until the end
+            page.close()
+            if page_no == 0:
+                # Header is always on page 1
+                header = parse_header(_words_to_text(words))
             try:
-                rows = parse_rows_from_page(page)
+                rows = parse_rows_from_page(page, words)
             except ValueError:
                 continue  # page has no stunde numbers at all (e.g. pure footer page)
             for row in rows:
-                if row["stunde"] not in seen_stunden:
-                    seen_stunden.add(row["stunde"])
+                if row.stunde not in seen_stunden:
+                    seen_stunden.add(row.stunde)
                     all_rows.append(row)
 
-        all_rows.sort(key=lambda r: r["stunde"])
+        all_rows.sort(key=lambda r: r.stunde)
         return {"header": header, "rows": all_rows}
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Parse cache  (extract_pdf results as JSON, keyed by PDF fingerprint)
+# ─────────────────────────────────────────────────────────────────────────────
+
+PDF_CACHE_DIR     = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "klassenbuch_pdf"
+PDF_CACHE_VERSION = 1   # bump whenever extract_pdf's output changes
+
+
+_FINGERPRINT_CHUNK = 4096
+
+
+def pdf_fingerprint(pdf_path: str) -> str:
+    """
+    Parse-cache key: file size + blake2b over the first and last 4 KiB.
+    The tail holds the PDF trailer (xref offsets, document /ID), which tells
+    apart PDFs from the same template without hashing the whole file.
+    """
+    with open(pdf_path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        digest = hashlib.blake2b(fh.read(_FINGERPRINT_CHUNK), digest_size=16)
+        if size > _FINGERPRINT_CHUNK:
+            fh.seek(max(size - _FINGERPRINT_CHUNK, _FINGERPRINT_CHUNK))
+            digest.update(fh.read())
+    return f"{size:x}-{digest.hexdigest()}"
+
+
+def extract_pdf_cached(pdf_path: str, cache_dir: Path | None = PDF_CACHE_DIR) -> dict:
+    """
+    extract_pdf with an on-disk cache: re-runs over unchanged PDFs skip
+    pdfplumber entirely.  cache_dir=None disables the cache.
+    """
+    if cache_dir is None:
+        return extract_pdf(pdf_path)
+
+    cache_file = cache_dir / f"{pdf_fingerprint(pdf_path)}-v{PDF_CACHE_VERSION}.json"
+    try:
+        with open(cache_file, encoding="utf-8") as fh:
+            cached = json.load(fh)
+        return {"header": cached["header"], "rows": [Row(**r) for r in cached["rows"]]}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # cache miss or unreadable entry — parse again
+
+    pdf_data = extract_pdf(pdf_path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so parallel workers never see a half-written file
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as fh:
+            json.dump({"header": pdf_data["header"],
+                       "rows":   [asdict(r) for r in pdf_data["rows"]]},
+                      fh, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"WARNING: could not write parse cache {cache_file}: {e}", file=sys.stderr)
+    return pdf_data
+
+
+def _extract_pdf_job(pdf_path: str,
+                     cache_dir: Path | None) -> tuple[dict | None, str | None]:
+    """
+    Worker-process entry point: run extract_pdf_cached and return
+    (pdf_data, None), or (None, error message) so one broken PDF does not
+    abort the whole batch.
+    """
+    try:
+        return extract_pdf_cached(pdf_path, cache_dir), None
+    except Exception as e:
+        return None, str(e)
+
+
+def extract_pdfs(pdf_paths: list[str],
+                 cache_dir: Path | None) -> Iterator[tuple[dict | None, str | None]]:
+    """
+    Yield _extract_pdf_job results for pdf_paths, in input order, as they
+    become ready.  Several PDFs are parsed in a process pool sized to the
+    batch; a single PDF is parsed in-process.
+
+    Workers are started via forkserver (spawn where unavailable), never
+    forked from this process — it may already hold the DB connection and
+    the open import transaction.  A worker that dies (OOM kill, segfault in
+    the PDF parser) fails the PDFs still outstanding instead of the run.
+    """
+    job = partial(_extract_pdf_job, cache_dir=cache_dir)
+    if len(pdf_paths) <= 1:
+        yield from map(job, pdf_paths)
+        return
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    workers = min(len(pdf_paths), os.cpu_count() or 1)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context(method)) as ex:
+        try:
+            # One PDF per task: each is seconds of CPU, so IPC is noise, and
+            # batching would idle workers and delay the first result
+            for result in ex.map(job, pdf_paths):
+                yield result
+                done += 1
+        except BrokenProcessPool as e:
+            for _ in pdf_paths[done:]:
+                yield None, f"PDF worker process died: {e}"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # In-memory deduplication state
 # ─────────────────────────────────────────────────────────────────────────────
@@ -364,133 +575,248 @@ def extract_pdf(pdf_path: str) -> dict:
 # DB-execute path  (no manual IDs — PostgreSQL SERIAL handles everything)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _get_or_create_dozent(cur, cache: dict, vorname: str, nachname: str) -> int:
+def _get_or_create_dozent(cur, vorname: str, nachname: str, upsert: bool = True) -> int:
     """
     Return the dozent_id for (vorname, nachname), creating the row if needed.
-    Uses SELECT-then-INSERT because dozent has no UNIQUE on (vorname, nachname).
+    upsert=True: one round trip — the no-op DO UPDATE makes RETURNING fire on
+    conflict too.  Needs the UNIQUE index (PGConnector.ensure_dozent_unique).
+    upsert=False: SELECT-then-INSERT, for databases without that index.
     """
     key = (vorname, nachname)
-    if key in cache["dozenten"]:
-        return cache["dozenten"][key]
+    if upsert:
+        cur.execute(
+            "INSERT INTO dozent (vorname, nachname) VALUES (%s, %s) "
+            "ON CONFLICT (vorname, nachname) DO UPDATE SET vorname = EXCLUDED.vorname "
+            "RETURNING dozent_id;",
+            key,
+        )
+        return cur.fetchone()[0]
 
-    # Check if the row already exists in the DB
     cur.execute(
         "SELECT dozent_id FROM dozent WHERE vorname=%s AND nachname=%s LIMIT 1;",
         key,
     )
     row = cur.fetchone()
     if row:
-        did = row[0]
-    else:
+        return row[0]
+    cur.execute(
+        "INSERT INTO dozent (vorname, nachname) VALUES (%s, %s) RETURNING dozent_id;",
+        key,
+    )
+    return cur.fetchone()[0]
+
+
+def missing_parents(pdf_data: dict, cache: dict) -> tuple[bool, list[tuple[str, str]]]:
+    """
+    What insert_pdf_parents has to write for this PDF: whether its lernfeld
+    is new, and the (vorname, nachname) keys not in the dozent cache yet.
+    """
+    dozenten = cache["dozenten"]
+    lf_new = pdf_data["header"]["lernfeld_id"] not in cache["lernfelder"]
+    dozent_keys = list(dict.fromkeys(
+        key for key in ((r.dozent_vorname, r.dozent_nachname) for r in pdf_data["rows"])
+        if key not in dozenten
+    ))
+    return lf_new, dozent_keys
+
+
+def insert_pdf_parents(
+    pdf_data: dict, cur, lf_new: bool, dozent_keys: list[tuple[str, str]],
+    dozent_upsert: bool = True,
+) -> tuple[int, dict[tuple[str, str], int]]:
+    """
+    Write the lernfeld (if new) and dozent rows found by missing_parents.
+    Uses RETURNING to get auto-generated SERIAL IDs — never passes IDs manually.
+    Leaves the cache alone — queue_pdf_rows publishes the new IDs once this
+    succeeded, so a PDF rolled back to its savepoint leaves no IDs behind
+    that the bulk insert would trip over.
+    dozent_upsert is passed on to _get_or_create_dozent.
+    Returns (rows written, {(vorname, nachname): new dozent_id}).
+    """
+    hdr = pdf_data["header"]
+    written = 0
+
+    # ── lernfeld (VARCHAR PK — ON CONFLICT handles re-runs) ──────────────
+    if lf_new:
         cur.execute(
-            "INSERT INTO dozent (vorname, nachname) VALUES (%s, %s) RETURNING dozent_id;",
-            key,
+            "INSERT INTO lernfeld (lernfeld_id, titel, start_datum, end_datum) "
+            "VALUES (%s, %s, %s, %s) ON CONFLICT (lernfeld_id) DO NOTHING;",
+            (hdr["lernfeld_id"], hdr["titel"], hdr["start_datum"],
+             hdr["end_datum"] if hdr["end_datum"] else None),
         )
-        did = cur.fetchone()[0]
+        written += cur.rowcount
 
-    cache["dozenten"][key] = did
-    return did
+    # ── dozenten ─────────────────────────────────────────────────────────
+    new_dozenten = {
+        key: _get_or_create_dozent(cur, *key, upsert=dozent_upsert)
+        for key in dozent_keys
+    }
+    return written, new_dozenten
 
 
-def execute_pdf_into_db(pdf_data: dict, cur, cache: dict) -> int:
+def queue_pdf_rows(
+    pdf_data: dict, cache: dict, new_dozenten: dict[tuple[str, str], int],
+) -> int:
     """
-    Insert one PDF's data directly using the DB cursor.
-    Uses RETURNING to get auto-generated SERIAL IDs — never passes IDs manually.
+    Queue one PDF's lerntag, link and unterrichtseinheit rows for
+    flush_pending_into_db and publish its lernfeld / new dozenten to the
+    cache.  Runs no SQL: every dozent must be cached or in new_dozenten
+    (see insert_pdf_parents).  Returns the number of rows queued.
 
     Schema (updated):
         lerntag now has a dozent_id column.
-        dozent has no UNIQUE on (vorname, nachname) — handled via SELECT-then-INSERT.
+        dozent has UNIQUE (vorname, nachname) — resolved via a single upsert.
 
     cache keys (shared across all PDFs in a run):
-        'lernfelder' : set of lernfeld_id strings
-        'dozenten'   : (vorname, nachname) -> dozent_id
-        'lerntage'   : datum_str -> lerntag_id
-        'lf_doz'     : set of (lernfeld_id, dozent_id)
+        'lernfelder'        : set of lernfeld_id strings
+        'dozenten'          : (vorname, nachname) -> dozent_id
+        'lerntage'          : set of datum strings (in the DB or queued)
+        'lf_doz'            : set of (lernfeld_id, dozent_id)
+        'pending_lerntage'  : [(datum, lernfeld_id, dozent_id)] — see flush_pending_into_db
+        'pending_lf_doz'    : [(lernfeld_id, dozent_id)]        — see flush_pending_into_db
+        'pending_einheiten' : [(datum, stunde, inhalt)]         — see flush_pending_into_db
+        'queued_einheiten'  : set of (datum, stunde) queued this run — first PDF wins
     """
     hdr  = pdf_data["header"]
     rows = pdf_data["rows"]
-    affected = 0
-
-    lf_id = hdr["lernfeld_id"]
 
-    # ── lernfeld (VARCHAR PK — ON CONFLICT handles re-runs) ──────────────
-    if lf_id not in cache["lernfelder"]:
-        cur.execute(
-            "INSERT INTO lernfeld (lernfeld_id, titel, start_datum, end_datum) "
-            "VALUES (%s, %s, %s, %s) ON CONFLICT (lernfeld_id) DO NOTHING;",
-            (lf_id, hdr["titel"], hdr["start_datum"],
-             hdr["end_datum"] if hdr["end_datum"] else None),
-        )
-        affected += cur.rowcount
-        cache["lernfelder"].add(lf_id)
+    lerntage = cache["lerntage"]
+    lf_doz   = cache["lf_doz"]
 
-    # ── dozenten — resolve all unique names that appear in this PDF ───────
+    lf_id    = hdr["lernfeld_id"]
+    dozenten = ChainMap(new_dozenten, cache["dozenten"])
     # All stunden on one day share the same dozent; collect unique names.
-    dozent_keys = {
-        (r["dozent_vorname"], r["dozent_nachname"]) for r in rows
-    }
-    for vorname, nachname in dozent_keys:
-        did = _get_or_create_dozent(cur, cache, vorname, nachname)
+    dozent_ids = {dozenten[(r.dozent_vorname, r.dozent_nachname)] for r in rows}
+    # Use the dozent from the first row (all stunden on a day share one dozent).
+    day_dozent = dozenten[(rows[0].dozent_vorname, rows[0].dozent_nachname)]
 
-        # lernfeld_dozent link
-        combo = (lf_id, did)
-        if combo not in cache["lf_doz"]:
-            cur.execute(
-                "INSERT INTO lernfeld_dozent (lernfeld_id, dozent_id) "
-                "VALUES (%s, %s) ON CONFLICT (lernfeld_id, dozent_id) DO NOTHING;",
-                (lf_id, did),
-            )
-            affected += cur.rowcount
-            cache["lf_doz"].add(combo)
+    cache["lernfelder"].add(lf_id)
+    cache["dozenten"].update(new_dozenten)
 
-    # ── lerntag (SERIAL PK, UNIQUE datum) ────────────────────────────────
-    # Use the dozent from the first row (all stunden on a day share one dozent).
+    # lernfeld_dozent links
+    new_links = [(lf_id, did) for did in dozent_ids if (lf_id, did) not in lf_doz]
+    cache["pending_lf_doz"].extend(new_links)
+    lf_doz.update(new_links)
+    queued = len(new_links)
+
+    # lerntag (SERIAL PK, UNIQUE datum) — the first PDF for a datum wins
     datum = hdr["datum"]
-    if datum not in cache["lerntage"]:
-        first_row  = rows[0]
-        day_dozent = _get_or_create_dozent(
-            cur, cache,
-            first_row["dozent_vorname"], first_row["dozent_nachname"],
-        )
+    if datum not in lerntage:
+        cache["pending_lerntage"].append((datum, lf_id, day_dozent))
+        lerntage.add(datum)
+        queued += 1
+
+    # unterrichtseinheiten — matched to their lerntag by datum on insert.
+    # inhalt is cleaned here, per PDF, so one PDF's text cannot fail the
+    # shared COPY in flush_pending_into_db for every other PDF.
+    # A (datum, stunde) already queued is dropped: the staged rows reach
+    # ON CONFLICT in plan order, so only one candidate per key may be staged.
+    # Bind the per-row cache tables once, outside the loop
+    queued_einheiten  = cache["queued_einheiten"]
+    pending_einheiten = cache["pending_einheiten"]
+    for row in rows:
+        key = (datum, row.stunde)
+        if key not in queued_einheiten:
+            queued_einheiten.add(key)
+            pending_einheiten.append((datum, row.stunde, db_text(row.inhalt)))
+            queued += 1
+
+    return queued
+
+
+def flush_pending_into_db(cur, cache: dict) -> int:
+    """
+    Insert all queued lerntag / lernfeld_dozent / unterrichtseinheit rows
+    collected by queue_pdf_rows.  Empties the queues; returns the number
+    of new rows.
+
+    lerntag and lernfeld_dozent go out as multi-row INSERTs.  The
+    unterrichtseinheit rows are streamed with COPY into a TEMP staging table
+    and moved over with one INSERT … SELECT that looks up lerntag_id by datum,
+    so ON CONFLICT still applies.
+    """
+    affected = 0
+    # Each table goes out in one statement per flush (execute_values pages
+    # or COPY) — no per-row INSERT is left for a PREPAREd statement to save.
+    if cache["pending_lerntage"]:
+        affected += len(psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO lerntag (datum, lernfeld_id, dozent_id) VALUES %s "
+            "ON CONFLICT (datum) DO NOTHING RETURNING 1;",
+            cache["pending_lerntage"], page_size=1000, fetch=True,
+        ))
+        cache["pending_lerntage"].clear()
+    if cache["pending_lf_doz"]:
+        affected += len(psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO lernfeld_dozent (lernfeld_id, dozent_id) VALUES %s "
+            "ON CONFLICT (lernfeld_id, dozent_id) DO NOTHING RETURNING 1;",
+            cache["pending_lf_doz"], page_size=1000, fetch=True,
+        ))
+        cache["pending_lf_doz"].clear()
+    if cache["pending_einheiten"]:
+        # QUOTE_NONNUMERIC quotes every inhalt, so '' stays '' (not NULL) in COPY
+        buf = io.StringIO()
+        csv.writer(buf, quoting=csv.QUOTE_NONNUMERIC).writerows(cache["pending_einheiten"])
+        buf.seek(0)
         cur.execute(
-            "INSERT INTO lerntag (datum, lernfeld_id, dozent_id) "
-            "VALUES (%s, %s, %s) "
-            "ON CONFLICT (datum) DO NOTHING "
-            "RETURNING lerntag_id;",
-            (datum, lf_id, day_dozent),
+            "CREATE TEMP TABLE stg_einheit "
+            "(datum DATE, stunde INT, inhalt TEXT) ON COMMIT DROP;"
         )
-        result = cur.fetchone()
-        if result:
-            lt_id = result[0]
-        else:
-            # Already existed — just fetch the ID
-            cur.execute("SELECT lerntag_id FROM lerntag WHERE datum=%s;", (datum,))
-            lt_id = cur.fetchone()[0]
-        affected += 1
-        cache["lerntage"][datum] = lt_id
-    lt_id = cache["lerntage"][datum]
-
-    # ── unterrichtseinheiten (SERIAL PK, UNIQUE lerntag_id+stunde) ────────
-    for row in rows:
+        cur.copy_expert("COPY stg_einheit (datum, stunde, inhalt) FROM STDIN WITH CSV", buf)
         cur.execute(
             "INSERT INTO unterrichtseinheit (lerntag_id, stunde, inhalt) "
-            "VALUES (%s, %s, %s) "
-            "ON CONFLICT (lerntag_id, stunde) DO NOTHING;",
-            (lt_id, row["stunde"], row["inhalt"]),
+            "SELECT lt.lerntag_id, s.stunde, s.inhalt "
+            "FROM stg_einheit s JOIN lerntag lt USING (datum) "
+            "ON CONFLICT (lerntag_id, stunde) DO NOTHING;"
         )
         affected += cur.rowcount
-
+        cache["pending_einheiten"].clear()
     return affected
 
 
+def warm_db_cache(cur, cache: dict) -> int:
+    """
+    Preload the keys of rows already in the DB into `cache` (see
+    queue_pdf_rows), so known lernfelder / dozenten / lerntage / links
+    need no probe queries.  Four SELECTs per run; returns rows loaded.
+    """
+    before = sum(len(cache[k]) for k in ("dozenten", "lerntage", "lernfelder", "lf_doz"))
+    cur.execute("SELECT vorname, nachname, dozent_id FROM dozent;")
+    cache["dozenten"].update(((vorname, nachname), did) for vorname, nachname, did in cur)
+    cur.execute("SELECT datum FROM lerntag;")
+    cache["lerntage"].update(datum.isoformat() for (datum,) in cur)
+    cur.execute("SELECT lernfeld_id FROM lernfeld;")
+    cache["lernfelder"].update(lf_id for (lf_id,) in cur)
+    cur.execute("SELECT lernfeld_id, dozent_id FROM lernfeld_dozent;")
+    cache["lf_doz"].update((lf_id, did) for lf_id, did in cur)
+    return sum(len(cache[k]) for k in ("dozenten", "lerntage", "lernfelder", "lf_doz")) - before
+
+
 def make_db_cache() -> dict:
-    return {"lernfelder": set(), "dozenten": {}, "lerntage": {}, "lf_doz": set()}
+    return {
+        "lernfelder": set(), "dozenten": {}, "lerntage": set(), "lf_doz": set(),
+        "pending_lerntage": [], "pending_lf_doz": [], "pending_einheiten": [],
+        "queued_einheiten": set(),
+    }
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Print / dry-run path  (self-contained SQL file with explicit IDs from 1)
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Written once before the first PDF's statements; the file ends with COMMIT;
+PRINT_SQL_HEADER = (
+    "-- Auto-generated by pdf_to_sql.py\n"
+    "-- NOTE: end_datum may be NULL when the PDF has no closing date\n"
+    "\n"
+    "SET standard_conforming_strings = on;\n"
+    "\n"
+    "BEGIN;\n"
+    "\n"
+)
+
+
 class PrintState:
     """Tracks IDs only for generating a standalone SQL file (no DB needed)."""
     def __init__(self):
@@ -503,32 +829,36 @@ class PrintState:
         self.einheit_seq = 1
 
 
-def build_print_statements(pdf_data: dict, state: PrintState) -> list[str]:
+def build_print_statements(pdf_data: dict, state: PrintState) -> Iterator[str]:
+    """
+    Yield the SQL statements for one PDF.  `state` is updated as the
+    generator is consumed, so consume it fully before the next PDF.
+    Every value goes through sql_literal.
+    """
     hdr  = pdf_data["header"]
     rows = pdf_data["rows"]
-    stmts = []
 
     lf_id = hdr["lernfeld_id"]
+    lf    = sql_literal(lf_id)
     if lf_id not in state.lernfelder:
         state.lernfelder[lf_id] = True
-        start_val = f"'{hdr['start_datum']}'" if hdr["start_datum"] else "NULL"
-        end_val   = f"'{hdr['end_datum']}'"   if hdr["end_datum"]   else "NULL"
-        stmts.append(
+        yield (
             f"INSERT INTO lernfeld (lernfeld_id, titel, start_datum, end_datum) "
-            f"VALUES ('{lf_id}', '{sql_escape(hdr['titel'])}', "
-            f"{start_val}, {end_val}) "
+            f"VALUES ({lf}, {sql_literal(hdr['titel'])}, "
+            f"{sql_literal(hdr['start_datum'])}, {sql_literal(hdr['end_datum'])}) "
             f"ON CONFLICT (lernfeld_id) DO NOTHING;"
         )
 
     # ── dozenten first (lerntag references dozent_id) ────────────────────
     for row in rows:
-        key = (row["dozent_vorname"], row["dozent_nachname"])
+        key = (row.dozent_vorname, row.dozent_nachname)
+        vorname, nachname = sql_literal(key[0]), sql_literal(key[1])
         if key not in state.dozenten:
             state.dozenten[key] = state.dozent_seq
             state.dozent_seq += 1
-            stmts.append(
+            yield (
                 f"INSERT INTO dozent (vorname, nachname) "
-                f"VALUES ('{sql_escape(key[0])}', '{sql_escape(key[1])}') "
+                f"VALUES ({vorname}, {nachname}) "
                 f"ON CONFLICT DO NOTHING;"
             )
         did = state.dozenten[key]
@@ -536,41 +866,40 @@ def build_print_statements(pdf_data: dict, state: PrintState) -> list[str]:
         combo = (lf_id, did)
         if combo not in state.lf_doz:
             state.lf_doz.add(combo)
-            stmts.append(
+            yield (
                 f"INSERT INTO lernfeld_dozent (lernfeld_id, dozent_id) "
-                f"SELECT '{lf_id}', dozent_id FROM dozent "
-                f"WHERE vorname='{sql_escape(key[0])}' AND nachname='{sql_escape(key[1])}' "
+                f"SELECT {lf}, dozent_id FROM dozent "
+                f"WHERE vorname={vorname} AND nachname={nachname} "
                 f"LIMIT 1 "
                 f"ON CONFLICT (lernfeld_id, dozent_id) DO NOTHING;"
             )
 
     # ── lerntag — includes dozent_id via subquery ─────────────────────────
     datum = hdr["datum"]
+    dt    = sql_literal(datum)
     if datum not in state.lerntage:
         state.lerntage[datum] = state.lerntag_seq
         state.lerntag_seq += 1
         first = rows[0]
-        stmts.append(
+        yield (
             f"INSERT INTO lerntag (datum, lernfeld_id, dozent_id) "
-            f"SELECT '{datum}', '{lf_id}', dozent_id "
+            f"SELECT {dt}, {lf}, dozent_id "
             f"FROM dozent "
-            f"WHERE vorname='{sql_escape(first['dozent_vorname'])}' "
-            f"AND nachname='{sql_escape(first['dozent_nachname'])}' "
+            f"WHERE vorname={sql_literal(first.dozent_vorname)} "
+            f"AND nachname={sql_literal(first.dozent_nachname)} "
             f"LIMIT 1 "
             f"ON CONFLICT (datum) DO NOTHING;"
         )
 
     # ── unterrichtseinheiten — subquery resolves lerntag_id by datum ──────
     for row in rows:
-        stmts.append(
+        yield (
             f"INSERT INTO unterrichtseinheit (lerntag_id, stunde, inhalt) "
-            f"SELECT lerntag_id, {row['stunde']}, '{sql_escape(row['inhalt'])}' "
-            f"FROM lerntag WHERE datum='{datum}' "
+            f"SELECT lerntag_id, {sql_literal(row.stunde)}, {sql_literal(row.inhalt)} "
+            f"FROM lerntag WHERE datum={dt} "
             f"ON CONFLICT (lerntag_id, stunde) DO NOTHING;"
         )
 
-    return stmts
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Permission helpers
@@ -593,7 +922,7 @@ def check_permissions(cur, db_user: str) -> dict[str, list[str]]:
         ORDER  BY table_name, privilege_type;
     """, (db_user, SCHEMA_TABLES))
     result = {t: [] for t in SCHEMA_TABLES}
-    for row in cur.fetchall():
+    for row in cur:
         result[row["table_name"]].append(row["privilege_type"])
     return result
 
@@ -638,6 +967,7 @@ class PGConnector:
             sys.exit(1)
         self.conn.autocommit = False
         self.current_user = user
+        self.dozent_upsert = True   # see ensure_dozent_unique
         print("Connected.", file=sys.stderr)
 
     # ── permission check / fix ────────────────────────────────────────────
@@ -675,32 +1005,149 @@ class PGConnector:
         print("  ✓ Permissions granted.\n")
         return True
 
+    # ── schema migration ──────────────────────────────────────────────────
+
+    def ensure_dozent_unique(self) -> None:
+        """
+        Make sure dozent has a UNIQUE index on (vorname, nachname) — under any
+        name — and create it if missing (databases created from older
+        init_db.sql versions lack it).  If it cannot be created (e.g. the app
+        role only has DML grants), dozent_upsert is switched off and dozenten
+        are resolved with SELECT-then-INSERT instead of aborting the import.
+        """
+        stmt = (f"CREATE UNIQUE INDEX IF NOT EXISTS {DOZENT_UNIQUE_INDEX} "
+                f"ON dozent (vorname, nachname);")
+        with self.conn.cursor() as cur:
+            try:
+                cur.execute(DOZENT_UNIQUE_SQL)
+                has_index = cur.fetchone()[0]
+            except psycopg2.Error as e:
+                self.conn.rollback()
+                raise self._db_error(e, "dozent index check")
+            if not has_index:
+                print(f"Creating unique index {DOZENT_UNIQUE_INDEX} on dozent …",
+                      file=sys.stderr)
+                reason = f"another relation is already named {DOZENT_UNIQUE_INDEX}"
+                try:
+                    cur.execute(stmt)
+                    # IF NOT EXISTS also skips when the name is taken by
+                    # something else — check again
+                    cur.execute(DOZENT_UNIQUE_SQL)
+                    has_index = cur.fetchone()[0]
+                except psycopg2.Error as e:
+                    reason = str(e).strip()
+                if not has_index:
+                    self.conn.rollback()
+                    self.dozent_upsert = False
+                    print(f"WARNING: Could not create unique index on dozent:\n  {reason}\n"
+                          f"  Falling back to SELECT-then-INSERT for dozenten.\n"
+                          f"  To enable the upsert, remove duplicate dozent rows, "
+                          f"then run as the table owner:\n"
+                          f"    {stmt}", file=sys.stderr)
+                    return
+        self.conn.commit()
+
     # ── execute one PDF directly (no manual IDs) ─────────────────────────
 
-    def execute_pdf(self, pdf_data: dict, cache: dict, source_label="") -> int:
+    def execute_pdf(self, pdf_data: dict, cache: dict, source_label="") -> tuple[int, int]:
         """
         Insert one PDF's data using parameterised queries and RETURNING.
         The DB SERIAL sequences assign all IDs — we never pass one manually.
+        Lerntag / link / unterrichtseinheit rows are only queued — call flush()
+        afterwards.  Returns (rows written, rows queued).
+        Runs inside the import transaction (begin / commit_all); a failing PDF
+        is rolled back to its own savepoint.
+        """
+        written, new_dozenten = 0, {}
+        lf_new, dozent_keys = missing_parents(pdf_data, cache)
+        # Only a new lernfeld / dozent needs SQL; a PDF whose parents are
+        # all cached skips the SAVEPOINT / RELEASE round trips.
+        if lf_new or dozent_keys:
+            written, new_dozenten = self._run_in_savepoint(
+                lambda cur: insert_pdf_parents(pdf_data, cur, lf_new, dozent_keys,
+                                               self.dozent_upsert),
+                source_label,
+            )
+        return written, queue_pdf_rows(pdf_data, cache, new_dozenten)
+
+    def warm_cache(self, cache: dict) -> int:
+        """Preload existing DB keys into the shared cache; returns rows loaded."""
+        return self._run_in_transaction(
+            lambda cur: warm_db_cache(cur, cache), "cache warm-up",
+        )
+
+    def flush(self, cache: dict) -> int:
+        """Bulk-insert the rows queued by execute_pdf; returns rows affected."""
+        return self._run_in_savepoint(
+            lambda cur: flush_pending_into_db(cur, cache), "bulk insert",
+        )
+
+    # ── import transaction ────────────────────────────────────────────────
+
+    def begin(self) -> None:
+        """
+        Open the import transaction: every execute_pdf() and the final flush()
+        are committed together by commit_all() — one commit per run instead of
+        one per PDF.  synchronous_commit is relaxed for this transaction only;
+        a crash may lose the run, never leave it half-applied.
+        """
+        with self.conn.cursor() as cur:
+            cur.execute("SET LOCAL synchronous_commit = OFF;")
+
+    def commit_all(self) -> None:
+        """Commit the import transaction opened by begin()."""
+        try:
+            self.conn.commit()
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            raise self._db_error(e, "commit")
+
+    def rollback_all(self) -> None:
+        """Roll back the import transaction opened by begin()."""
+        self.conn.rollback()
+
+    def _run_in_savepoint(self, work, source_label: str):
+        """
+        Run work(cur) inside the open import transaction and return its
+        result.  On failure only the work since the savepoint is rolled back;
+        DB errors are translated.
         """
+        with self.conn.cursor() as cur:
+            cur.execute("SAVEPOINT import_step;")
+            try:
+                affected = work(cur)
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT import_step;")
+                if isinstance(e, psycopg2.Error):
+                    raise self._db_error(e, source_label)
+                raise
+            cur.execute("RELEASE SAVEPOINT import_step;")
+        return affected
+
+    def _run_in_transaction(self, work, source_label: str) -> int:
+        """Run work(cur) and commit; roll back and translate DB errors on failure."""
         try:
             with self.conn.cursor() as cur:
-                affected = execute_pdf_into_db(pdf_data, cur, cache)
+                affected = work(cur)
             self.conn.commit()
             return affected
-        except psycopg2.errors.InsufficientPrivilege as e:
+        except psycopg2.Error as e:
             self.conn.rollback()
-            m = re.search(r'table "?(\w+)"?', str(e))
+            raise self._db_error(e, source_label)
+
+    def _db_error(self, e, source_label: str) -> Exception:
+        """Map a psycopg2 error to PermissionError (with fix hints) or RuntimeError."""
+        if isinstance(e, psycopg2.errors.InsufficientPrivilege):
+            m = _PERM_TABLE_RE.search(str(e))
             tbl = m.group(1) if m else "?"
-            raise PermissionError(
+            return PermissionError(
                 f"User '{self.current_user}' lacks INSERT on '{tbl}'.\n\n"
                 f"  Fix A: rerun with --fix-permissions --grant-to {self.current_user} "
                 f"--db-user <superuser>\n"
                 f"  Fix B: run as superuser:\n"
                 + "\n".join(f"    {s}" for s in grant_statements(self.current_user))
             )
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise RuntimeError(f"DB error in '{source_label}':\n  {e}")
+        return RuntimeError(f"DB error in '{source_label}':\n  {e}")
 
     # ── single query ──────────────────────────────────────────────────────
 
@@ -720,7 +1167,7 @@ class PGConnector:
                 return None
             except psycopg2.errors.InsufficientPrivilege as e:
                 self.conn.rollback()
-                m = re.search(r'table "?(\w+)"?', str(e))
+                m = _PERM_TABLE_RE.search(str(e))
                 tbl = m.group(1) if m else "?"
                 print(f"\n  ✗ Permission denied on '{tbl}'. Run '\\perms' for details.")
                 return None
@@ -811,14 +1258,18 @@ class PGConnector:
                 widths[c] = max(widths[c], len(str(r[c]) if r[c] is not None else "NULL"))
         sep  = "+" + "+".join("-" * (widths[c] + 2) for c in cols) + "+"
         head = "|" + "|".join(f" {c:<{widths[c]}} " for c in cols) + "|"
-        print(sep); print(head); print(sep)
-        for r in rows:
-            print("|" + "|".join(
+        # Build the whole table first — one write instead of one print per row
+        lines = [sep, head, sep]
+        lines.extend(
+            "|" + "|".join(
                 f" {str(r[c]) if r[c] is not None else 'NULL':<{widths[c]}} "
                 for c in cols
-            ) + "|")
-        print(sep)
-        print(f"({len(rows)} row{'s' if len(rows) != 1 else ''})\n")
+            ) + "|"
+            for r in rows
+        )
+        lines.append(sep)
+        lines.append(f"({len(rows)} row{'s' if len(rows) != 1 else ''})\n")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def close(self):
         self.conn.close()
@@ -942,6 +1393,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
                    help="Open interactive SQL shell after processing PDFs")
     p.add_argument("--dry-run",       action="store_true",
                    help="Print SQL to stdout, never write to DB")
+    p.add_argument("--no-cache",      action="store_true",
+                   help=f"Re-parse every PDF, ignoring the parse cache in {PDF_CACHE_DIR}")
     p.add_argument("pdfs", nargs="*",
                    help="PDF files/globs — overrides config [pdfs] section when given")
     return p
@@ -983,6 +1436,7 @@ def main():
     check_permissions = args.check_permissions or bool(mode_cfg.get("check_permissions", False))
     fix_permissions   = args.fix_permissions   or bool(mode_cfg.get("fix_permissions",   False))
     grant_to          = args.grant_to          or mode_cfg.get("grant_to", "")
+    use_parse_cache   = not args.no_cache      and bool(mode_cfg.get("parse_cache",       True))
 
     # ── PDF list: CLI args override config entirely ───────────────────────
     if args.pdfs:
@@ -1031,39 +1485,82 @@ def main():
     use_db      = connector is not None and not dry_run
     db_cache    = make_db_cache()
     print_state = PrintState()
-    all_statements: list[str] = []
+    printed_sql = False     # print mode: header written, COMMIT; still due
 
+    existing: list[Path] = []
     for path in pdf_paths:
         if not path.exists():
             print(f"WARNING: {path} not found – skipping", file=sys.stderr)
             continue
+        existing.append(path)
+
+    if use_db and existing:
+        try:
+            connector.ensure_dozent_unique()
+            loaded = connector.warm_cache(db_cache)
+        except (RuntimeError, PermissionError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            connector.close(); sys.exit(1)
+        print(f"Cache: {loaded} existing rows preloaded.", file=sys.stderr)
+        connector.begin()
+
+    # PDF parsing is CPU-bound — extract in worker processes and feed each
+    # result into the DB / print state here as soon as it is ready, in input
+    # order (IDs in print mode depend on it).  extract_pdfs is consumed
+    # lazily, so the DB work for one PDF overlaps the extraction of the next.
+    results = extract_pdfs([str(p) for p in existing],
+                           PDF_CACHE_DIR if use_parse_cache else None)
+    for path, (pdf_data, error) in zip(existing, results):
         print(f"Processing: {path.name}", file=sys.stderr)
+        if error is not None:
+            print(f"  ERROR in {path.name}: {error}", file=sys.stderr)
+            continue
         try:
-            pdf_data = extract_pdf(str(path))
             if use_db:
-                affected = connector.execute_pdf(pdf_data, db_cache,
-                                                 source_label=path.name)
-                print(f"  \u2713 {affected} rows affected.", file=sys.stderr)
+                written, queued = connector.execute_pdf(pdf_data, db_cache,
+                                                        source_label=path.name)
+                print(f"  \u2713 {written} rows written, {queued} queued.",
+                      file=sys.stderr)
             else:
-                stmts = build_print_statements(pdf_data, print_state)
-                all_statements.append(f"-- Source: {path.name}")
-                all_statements.extend(stmts)
-                all_statements.append("")
+                # Streamed per PDF; a PDF that fails midway writes nothing
+                stmts = list(build_print_statements(pdf_data, print_state))
+                if not printed_sql:
+                    sys.stdout.write(PRINT_SQL_HEADER)
+                    printed_sql = True
+                sys.stdout.write(f"-- Source: {path.name}\n")
+                sys.stdout.writelines(f"{stmt}\n" for stmt in stmts)
+                sys.stdout.write("\n")
         except PermissionError as e:
             print(f"\n  \u2717 PERMISSION ERROR in {path.name}:\n{e}\n", file=sys.stderr)
         except Exception as e:
             print(f"  ERROR in {path.name}: {e}", file=sys.stderr)
 
+    if use_db and existing:
+        affected = None
+        try:
+            affected = connector.flush(db_cache)
+            print(f"  \u2713 {affected} lerntag / link / unterrichtseinheit rows inserted.",
+                  file=sys.stderr)
+        except PermissionError as e:
+            print(f"\n  \u2717 PERMISSION ERROR in bulk insert:\n{e}\n", file=sys.stderr)
+        except Exception as e:
+            print(f"  ERROR in bulk insert: {e}", file=sys.stderr)
+        if affected is None:
+            # Lernfelder / dozenten without their lerntage would be a
+            # half-applied run — commit none of it
+            print("  Import rolled back, nothing committed.", file=sys.stderr)
+            connector.rollback_all()
+            connector.close(); sys.exit(1)
+        try:
+            connector.commit_all()
+        except RuntimeError as e:
+            print(f"  ERROR: {e}", file=sys.stderr)
+            connector.close(); sys.exit(1)
+
     # ── Print / dry-run output ────────────────────────────────────────────
     if not use_db:
-        if all_statements:
-            print("\n".join([
-                "-- Auto-generated by pdf_to_sql.py",
-                "-- NOTE: end_datum may be NULL when the PDF has no closing date",
-                "", "BEGIN;", "",
-                *all_statements,
-                "COMMIT;",
-            ]))
+        if printed_sql:
+            sys.stdout.write("COMMIT;\n")
         elif not do_query and not check_permissions and not fix_permissions:
             print("Nothing to do.  Add PDFs via CLI args or config [pdfs] section.",
                   file=sys.stderr)
@@ -5,11 +5,13 @@ Uses the original template as a base for pixel-perfect formatting.
 
 from __future__ import annotations
 import os
-import shutil
 import getpass
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter
 from typing import Optional
 
 try:
@@ -21,7 +23,6 @@ except ModuleNotFoundError:
         tomllib = None       # falls back gracefully
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
 from openpyxl import load_workbook
 
 def _find_template() -> str:
@@ -44,7 +45,7 @@ TEMPLATE_PATH = _find_template()
 # Data Classes
 # ─────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class Unterrichtseinheit:
     einheit_id: int
     stunde: int
@@ -54,7 +55,7 @@ class Unterrichtseinheit:
         return f"  Stunde {self.stunde}: {self.inhalt or '(kein Inhalt)'}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Dozent:
     dozent_id: int
     vorname: str
@@ -68,7 +69,7 @@ class Dozent:
         return self.full_name
 
 
-@dataclass
+@dataclass(slots=True)
 class Lernfeld:
     lernfeld_id: str
     titel: str
@@ -81,31 +82,43 @@ class Lernfeld:
         return f"{self.lernfeld_id}: {self.titel} ({self.start_datum} -> {self.end_datum}) | Dozenten: {dozs}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Lerntag:
     lerntag_id: int
     datum: date
     lernfeld: Optional[Lernfeld]
     dozent: Optional[Dozent]
+    # invariant: sorted by stunde — fetch_all appends them ORDER BY stunde
     einheiten: list[Unterrichtseinheit] = field(default_factory=list)
 
+    # ISO year / week, derived from datum once in __post_init__
+    _year:          int = field(init=False, repr=False, compare=False)
+    _calendar_week: int = field(init=False, repr=False, compare=False)
+    _year_week:     str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        iso = self.datum.isocalendar()
+        self._year          = iso[0]
+        self._calendar_week = iso[1]
+        self._year_week     = f"{iso[0]}-KW{iso[1]:02d}"
+
     @property
     def calendar_week(self):
-        return self.datum.isocalendar()[1]
+        return self._calendar_week
 
     @property
     def year(self):
-        return self.datum.isocalendar()[0]
+        return self._year
 
     @property
     def year_week(self):
-        return f"{self.year}-KW{self.calendar_week:02d}"
+        return self._year_week
 
     def __str__(self):
         lf  = self.lernfeld.lernfeld_id if self.lernfeld else "—"
         doz = self.dozent.full_name     if self.dozent   else "—"
         lines = [f"📅 {self.datum}  [{self.year_week}]  LF: {lf}  Dozent: {doz}"]
-        for e in sorted(self.einheiten, key=lambda x: x.stunde):
+        for e in self.einheiten:
             lines.append(str(e))
         return "\n".join(lines)
 
@@ -197,53 +210,68 @@ def get_connection(db_config: dict | None = None):
     return psycopg2.connect(**(db_config or DB_CONFIG))
 
 
+# Every Lerntag with its Lernfeld, Dozent and Einheiten in one result set
+_FETCH_ALL_SQL = """
+    SELECT lt.lerntag_id, lt.datum,
+           lf.lernfeld_id, lf.titel, lf.start_datum, lf.end_datum,
+           d.dozent_id, d.vorname, d.nachname,
+           ue.einheit_id, ue.stunde, ue.inhalt
+    FROM lerntag lt
+    LEFT JOIN lernfeld lf           ON lf.lernfeld_id = lt.lernfeld_id
+    LEFT JOIN dozent d              ON d.dozent_id    = lt.dozent_id
+    LEFT JOIN unterrichtseinheit ue ON ue.lerntag_id  = lt.lerntag_id
+    ORDER BY lt.datum, ue.stunde
+"""
+
+
 def fetch_all() -> list[Lerntag]:
-    with get_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-
-            cur.execute("SELECT * FROM dozent ORDER BY dozent_id")
-            dozent_map: dict[int, Dozent] = {
-                r["dozent_id"]: Dozent(r["dozent_id"], r["vorname"], r["nachname"])
-                for r in cur.fetchall()
-            }
-
-            cur.execute("SELECT * FROM lernfeld ORDER BY lernfeld_id")
-            lernfeld_map: dict[str, Lernfeld] = {
-                r["lernfeld_id"]: Lernfeld(
-                    r["lernfeld_id"], r["titel"], r["start_datum"], r["end_datum"]
-                )
-                for r in cur.fetchall()
-            }
-
-            cur.execute("SELECT * FROM lernfeld_dozent")
-            for r in cur.fetchall():
-                lf  = lernfeld_map.get(r["lernfeld_id"])
-                doz = dozent_map.get(r["dozent_id"])
-                if lf and doz:
-                    lf.dozenten.append(doz)
+    dozent_map:   dict[int, Dozent]   = {}
+    lernfeld_map: dict[str, Lernfeld] = {}
+    lerntag_map:  dict[int, Lerntag]  = {}
 
-            cur.execute(
-                "SELECT lerntag_id, datum, lernfeld_id, dozent_id FROM lerntag ORDER BY datum"
-            )
-            lerntag_map: dict[int, Lerntag] = {}
-            for r in cur.fetchall():
-                lerntag_map[r["lerntag_id"]] = Lerntag(
-                    lerntag_id=r["lerntag_id"],
-                    datum=r["datum"],
-                    lernfeld=lernfeld_map.get(r["lernfeld_id"]),
-                    dozent=dozent_map.get(r["dozent_id"]),
-                )
+    with get_connection() as conn:
+        # Server-side cursor: rows are streamed in batches of itersize
+        with conn.cursor(name="klassenbuch_stream") as cur:
+            cur.itersize = 5000
+            cur.execute(_FETCH_ALL_SQL)
+            for (lerntag_id, datum,
+                 lernfeld_id, titel, start_datum, end_datum,
+                 dozent_id, vorname, nachname,
+                 einheit_id, stunde, inhalt) in cur:
+                lt = lerntag_map.get(lerntag_id)
+                if lt is None:
+                    lf = doz = None
+                    if lernfeld_id is not None:
+                        lf = lernfeld_map.get(lernfeld_id)
+                        if lf is None:
+                            lf = lernfeld_map[lernfeld_id] = Lernfeld(
+                                lernfeld_id, titel, start_datum, end_datum
+                            )
+                    if dozent_id is not None:
+                        doz = dozent_map.get(dozent_id)
+                        if doz is None:
+                            doz = dozent_map[dozent_id] = Dozent(dozent_id, vorname, nachname)
+                    lt = lerntag_map[lerntag_id] = Lerntag(
+                        lerntag_id=lerntag_id,
+                        datum=datum,
+                        lernfeld=lf,
+                        dozent=doz,
+                    )
+                if einheit_id is not None:
+                    lt.einheiten.append(Unterrichtseinheit(einheit_id, stunde, inhalt or ""))
 
+        with conn.cursor() as cur:
             cur.execute(
-                "SELECT einheit_id, lerntag_id, stunde, inhalt "
-                "FROM unterrichtseinheit ORDER BY lerntag_id, stunde"
+                "SELECT ld.lernfeld_id, d.dozent_id, d.vorname, d.nachname "
+                "FROM lernfeld_dozent ld JOIN dozent d USING (dozent_id)"
             )
-            for r in cur.fetchall():
-                lt = lerntag_map.get(r["lerntag_id"])
-                if lt:
-                    lt.einheiten.append(
-                        Unterrichtseinheit(r["einheit_id"], r["stunde"], r["inhalt"] or "")
+            for lernfeld_id, dozent_id, vorname, nachname in cur:
+                lf = lernfeld_map.get(lernfeld_id)
+                if lf:
+                    doz = dozent_map.setdefault(
+                        dozent_id, Dozent(dozent_id, vorname, nachname)
                     )
+                    lf.dozenten.append(doz)
 
     return list(lerntag_map.values())
 
@@ -253,22 +281,32 @@ def fetch_all() -> list[Lerntag]:
 # ─────────────────────────────────────────────────────────
 
 def group_by_lernfeld(lerntage: list[Lerntag]) -> dict[str, list[Lerntag]]:
-    groups: dict[str, list[Lerntag]] = defaultdict(list)
+    groups: dict[str, list[Lerntag]] = {}
     for lt in lerntage:
         key = lt.lernfeld.lernfeld_id if lt.lernfeld else "—"
-        groups[key].append(lt)
-    return dict(sorted(groups.items()))
+        groups.setdefault(key, []).append(lt)
+    return dict(sorted(groups.items()))   # LF ids don't follow datum order
 
 
 def group_by_calendar_week(lerntage: list[Lerntag]) -> dict[str, list[Lerntag]]:
-    groups: dict[str, list[Lerntag]] = defaultdict(list)
-    for lt in lerntage:
-        groups[lt.year_week].append(lt)
-    return dict(sorted(groups.items()))
+    """
+    Group by year_week.  Expects lerntage ordered by datum (as fetch_all
+    returns them) — the weeks then come out in order without sorting, and
+    groupby hands over each week as one run.  Runs are merged, not replaced,
+    so unordered input still loses nothing.
+    """
+    groups: dict[str, list[Lerntag]] = {}
+    for year_week, week in groupby(lerntage, key=attrgetter("_year_week")):
+        groups.setdefault(year_week, []).extend(week)
+    return groups
 
 
 # ─────────────────────────────────────────────────────────
 # Excel Berichtsheft Export  (template-based)
+# Workbook(write_only=True) would skip the cell DOM, but it cannot start from
+# an existing sheet: merges, borders, print setup and header/footer of the
+# template would all have to be rebuilt by hand.  A week is ~110 cells, so
+# the regular mode stays.
 # ─────────────────────────────────────────────────────────
 
 # Template layout – first Excel row for each weekday block (Mon=0 … Fri=4)
@@ -280,24 +318,40 @@ _HOURS_COL     = 10  # column J
 _ROW_HEIGHT_PT = 12.5   # matches template default row height
 
 
+# Every variable cell of the template, resolved once at import time
+_DAY_ROWS = tuple(
+    first_row + offset
+    for first_row in _DAY_FIRST_ROW.values()
+    for offset in range(_ROWS_PER_DAY)
+)
+_CLEAR_CELLS = (
+    (1, 4),                 # Nr. + number  (D1)
+    (1, 6),                 # date + LF info (F1)
+    (2, 6),                 # Ausbilder + name (F2)
+    *((row, col) for row in _DAY_ROWS for col in (_CONTENT_COL, _HOURS_COL)),
+    (59, _HOURS_COL),       # total hours
+)
+
+
 def _clear_data_cells(ws) -> None:
     """Erase variable content cells, leaving all formatting intact."""
-    ws.cell(row=1, column=4).value = None   # Nr. + number  (D1)
-    ws.cell(row=1, column=6).value = None   # date + LF info (F1)
-    ws.cell(row=2, column=6).value = None   # Ausbilder + name (F2)
-
-    for first_row in _DAY_FIRST_ROW.values():
-        for offset in range(_ROWS_PER_DAY):
-            row = first_row + offset
-            ws.cell(row=row, column=_CONTENT_COL).value = None
-            ws.cell(row=row, column=_HOURS_COL).value   = None
-            ws.row_dimensions[row].height = None  # let Excel auto-fit
+    cells = ws._cells       # cells that were never written have nothing to clear
+    for key in _CLEAR_CELLS:
+        cell = cells.get(key)
+        if cell is not None:
+            cell.value = None
 
-    ws.cell(row=59, column=_HOURS_COL).value = None
+    # Let Excel auto-fit.  Only rows that already carry dimensions can have a
+    # fixed height — indexing row_dimensions would create empty entries.
+    # (Deleting the entry instead would also drop row-level formatting.)
+    dims = ws.row_dimensions
+    for row in _DAY_ROWS:
+        if row in dims:
+            dims[row].height = None
 
 
-def _fill_sheet(ws, week_lerntage, kw_number, kw_year, report_nr) -> None:
-    """Write week data into the cleared template sheet."""
+def _fill_sheet(ws, week_lerntage, kw_number, kw_year, report_nr) -> list[str]:
+    """Write week data into the cleared template sheet; returns the truncation warnings."""
 
     day_map: dict[int, Lerntag] = {}
     for lt in week_lerntage:
@@ -309,11 +363,7 @@ def _fill_sheet(ws, week_lerntage, kw_number, kw_year, report_nr) -> None:
     doz_sample = next((lt.dozent   for lt in week_lerntage if lt.dozent),   None)
 
     # ── Actual Mon–Fri dates of this calendar week ────────
-    jan4     = date(kw_year, 1, 4)
-    week_mon = jan4 + timedelta(
-        weeks=kw_number - jan4.isocalendar()[1],
-        days=-jan4.weekday()
-    )
+    week_mon = date.fromisocalendar(kw_year, kw_number, 1)
     week_fri = week_mon + timedelta(days=4)
     date_range = f"{week_mon.strftime('%d.%m.')} \u2013 {week_fri.strftime('%d.%m.%Y')}"
 
@@ -322,33 +372,89 @@ def _fill_sheet(ws, week_lerntage, kw_number, kw_year, report_nr) -> None:
     h1_value = date_range + lf_part
 
     # ── Fill header ───────────────────────────────────────
-    ws.cell(row=1, column=4).value = f"Nr. {report_nr}"          # D1:E1
-    ws.cell(row=1, column=6).value = h1_value                    # F1:J1
     doz_name = doz_sample.full_name if doz_sample else ""
-    ws.cell(row=2, column=6).value = f"Ausbilder: {doz_name}"   # F2:J2
+    writes = [
+        (1, 4, f"Nr. {report_nr}"),           # D1:E1
+        (1, 6, h1_value),                     # F1:J1
+        (2, 6, f"Ausbilder: {doz_name}"),    # F2:J2
+    ]
 
     # ── Fill day blocks ───────────────────────────────────
     total_hours = 0
+    warnings: list[str] = []
     for day_idx, first_row in _DAY_FIRST_ROW.items():
         lt        = day_map.get(day_idx)
-        einheiten = sorted(lt.einheiten, key=lambda e: e.stunde) if lt else []
+        einheiten = lt.einheiten if lt else []
 
         # Warn if data would be silently truncated
         if len(einheiten) > _ROWS_PER_DAY:
             day_name = ["Montag","Dienstag","Mittwoch","Donnerstag","Freitag"][day_idx]
-            print(f"  ⚠️  {day_name} KW{kw_number}: {len(einheiten)} Einheiten, "
-                  f"nur die ersten {_ROWS_PER_DAY} werden exportiert.")
-
-        for offset in range(_ROWS_PER_DAY):
-            row = first_row + offset
-            if offset < len(einheiten):
-                inhalt = einheiten[offset].inhalt
-                ws.cell(row=row, column=_CONTENT_COL).value = inhalt
-                ws.cell(row=row, column=_HOURS_COL).value   = 1
-                total_hours += 1
-
-    ws.cell(row=59, column=_HOURS_COL).value = total_hours
+            warnings.append(f"  ⚠️  {day_name} KW{kw_number}: {len(einheiten)} Einheiten, "
+                            f"nur die ersten {_ROWS_PER_DAY} werden exportiert.")
+
+        for row, e in enumerate(einheiten[:_ROWS_PER_DAY], start=first_row):
+            writes.append((row, _CONTENT_COL, e.inhalt))
+            writes.append((row, _HOURS_COL, 1))
+            total_hours += 1
+
+    writes.append((59, _HOURS_COL, total_hours))
+    for row, col, value in writes:
+        ws.cell(row=row, column=col, value=value)
+
     ws.title = f"KW{kw_number:02d} {kw_year}"
+    return warnings
+
+
+def _read_template(template_path: str) -> bytes:
+    """
+    Read the template once; every week is loaded from this in-memory copy.
+
+    pickle.loads / copy.deepcopy of a loaded Workbook would be much faster
+    than load_workbook, but openpyxl's row/column dimension dicts lose their
+    default factory on the round trip (KeyError on the first new row), so
+    each week re-parses the XML.
+    """
+    try:
+        with open(template_path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, IsADirectoryError):
+        raise FileNotFoundError(
+            f"Template not found:\n  {template_path}\n\n"
+            "Make sure 'berichtsheft_template.xlsx' is in the same folder as this script.\n"
+            "Or pass template_path='C:/full/path/berichtsheft_template.xlsx' explicitly."
+        ) from None
+
+
+def _split_year_week(year_week: str) -> tuple[int, int]:
+    """'2025-KW04' -> (4, 2025)"""
+    kw_year_str, kw_str = year_week.split("-KW")
+    return int(kw_str), int(kw_year_str)
+
+
+def _write_week(
+    template_buf: bytes,
+    week_days: list[Lerntag],
+    year_week: str,
+    output_path: str,
+    report_nr: int,
+) -> list[str]:
+    """
+    Fill a fresh copy of the template with one week and save it.
+
+    Returns the lines to print (truncation warnings, then the status line)
+    rather than printing them, so callers running weeks in threads keep
+    the console output in week order.
+    """
+    kw_number, kw_year = _split_year_week(year_week)
+
+    wb = load_workbook(BytesIO(template_buf))
+    ws = wb.active
+
+    _clear_data_cells(ws)
+    lines = _fill_sheet(ws, week_days, kw_number, kw_year, report_nr)
+
+    wb.save(output_path)
+    return lines + [f"✅  Saved: {output_path}  ({len(week_days)} Lerntag(e), KW {kw_number}/{kw_year})"]
 
 
 def create_berichtsheft(
@@ -371,40 +477,77 @@ def create_berichtsheft(
     """
     by_kw     = group_by_calendar_week(lerntage)
     week_days = by_kw.get(year_week, [])
+    for line in _write_week(_read_template(template_path), week_days, year_week,
+                            output_path, report_nr):
+        print(line)
 
-    kw_year_str, kw_str = year_week.split("-KW")
-    kw_number = int(kw_str)
-    kw_year   = int(kw_year_str)
 
-    if not os.path.isfile(template_path):
-        raise FileNotFoundError(
-            f"Template not found:\n  {template_path}\n\n"
-            "Make sure 'berichtsheft_template.xlsx' is in the same folder as this script.\n"
-            "Or pass template_path='C:/full/path/berichtsheft_template.xlsx' explicitly."
-        )
-    shutil.copy2(template_path, output_path)
-    wb = load_workbook(output_path)
-    ws = wb.active
-
-    _clear_data_cells(ws)
-    _fill_sheet(ws, week_days, kw_number, kw_year, report_nr)
+def create_berichtsheft_workbook(
+    lerntage: list[Lerntag],
+    output_path: str,
+    template_path: str = TEMPLATE_PATH,
+) -> None:
+    """
+    Export every calendar week as its own sheet of ONE .xlsx.
 
+    The template is loaded once and copied per week inside the same
+    workbook, so the whole export is saved in a single pass.
+    """
+    by_kw = group_by_calendar_week(lerntage)
+    if not by_kw:
+        print("⚠️  No Lerntage – nothing to export.")
+        return
+
+    wb          = load_workbook(BytesIO(_read_template(template_path)))
+    template_ws = wb.active
+    _clear_data_cells(template_ws)          # every copy starts out blank
+
+    for nr, (year_week, week_days) in enumerate(sorted(by_kw.items()), start=1):
+        kw_number, kw_year = _split_year_week(year_week)
+        for line in _fill_sheet(wb.copy_worksheet(template_ws), week_days,
+                                kw_number, kw_year, nr):
+            print(line)
+
+    wb.remove(template_ws)
+    wb.active = 0
     wb.save(output_path)
-    print(f"✅  Saved: {output_path}  ({len(week_days)} Lerntag(e), KW {kw_number}/{kw_year})")
+    print(f"✅  Saved: {output_path}  ({len(by_kw)} Woche(n), {len(lerntage)} Lerntag(e))")
 
 
 def create_all_berichtshefte(
     lerntage: list[Lerntag],
     output_dir: str = "berichtshefte",
     template_path: str = TEMPLATE_PATH,
+    single_file: bool = False,
 ) -> None:
-    """Export one Berichtsheft .xlsx per calendar week found in the data."""
+    """
+    Export one Berichtsheft .xlsx per calendar week found in the data.
+
+    single_file=True writes all weeks as sheets of 'berichtshefte.xlsx'
+    instead (see create_berichtsheft_workbook).
+    """
     os.makedirs(output_dir, exist_ok=True)
+    if single_file:
+        create_berichtsheft_workbook(
+            lerntage, os.path.join(output_dir, "berichtshefte.xlsx"), template_path
+        )
+        return
+
+    template_buf = _read_template(template_path)
     by_kw = group_by_calendar_week(lerntage)
-    for nr, (year_week, _) in enumerate(sorted(by_kw.items()), start=1):
-        filename = os.path.join(output_dir, f"berichtsheft_{year_week}.xlsx")
-        create_berichtsheft(lerntage, year_week, filename, report_nr=nr,
-                            template_path=template_path)
+
+    # Weeks are independent workbooks; zlib releases the GIL while saving,
+    # so a few threads overlap.  Warnings and status lines are printed in
+    # week order.
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        jobs = [
+            ex.submit(_write_week, template_buf, week_days, year_week,
+                      os.path.join(output_dir, f"berichtsheft_{year_week}.xlsx"), nr)
+            for nr, (year_week, week_days) in enumerate(sorted(by_kw.items()), start=1)
+        ]
+        for job in jobs:
+            for line in job.result():
+                print(line)
 
 
 # ─────────────────────────────────────────────────────────